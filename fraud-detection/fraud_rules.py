@@ -1,17 +1,58 @@
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import bisect
 import logging
+import re
+import threading
+import time
+
+# Strict "YYYY-MM-DDTHH:MM:SS[Z]" shape sent by the Java service
+_ISO_UTC_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z?")
+
+# Per-user history is split across independently locked shards (power of two)
+_NUM_SHARDS = 64
+# Users with no transaction for this long (wall clock) are dropped from memory
+_IDLE_EVICT_SECONDS = 300.0
+
+_UTC = timezone.utc
+_fromisoformat = datetime.fromisoformat
+
+
+@lru_cache(maxsize=4096)
+def _fast_parse_epoch(ts: str) -> Optional[float]:
+    """Epoch seconds for a strict UTC timestamp, or None if it needs the full parser."""
+    match = _ISO_UTC_RE.fullmatch(ts)
+    if match is None:
+        return None
+    try:
+        return datetime(*map(int, match.groups()), tzinfo=_UTC).timestamp()
+    except ValueError:
+        return None
+
 
 class FraudDetectionEngine:
     def __init__(self):
-        # In-memory tracking of recent transaction timestamps per user
-        self.user_transactions: Dict[str, List[datetime]] = {}
+        # In-memory tracking of recent transaction timestamps per user, as sorted
+        # arrays of epoch seconds (8 bytes each), sharded by hash(user_id) so
+        # different users never share a lock. Each shard also records when it
+        # last saw each user, by time.monotonic(): eviction must not trust the
+        # client-supplied transaction timestamps
+        self._shards: List[Tuple[threading.Lock, Dict[str, array], Dict[str, float]]] = [
+            (threading.Lock(), {}, {}) for _ in range(_NUM_SHARDS)
+        ]
+        # time.monotonic() of each shard's last idle sweep
+        self._last_sweep: List[float] = [time.monotonic()] * _NUM_SHARDS
         self.logger = logging.getLogger(__name__)
 
     def analyze_transaction(self, user_id: str, amount: float, timestamp: str) -> Dict:
         try:
-            # Parse ISO8601 timestamp; ensure timezone-aware
-            trans_time = self._parse_iso_timestamp(timestamp)
+            # Parse ISO8601 timestamp to epoch seconds; bursts share timestamps, so
+            # the strict format is served from cache and anything else is parsed fully
+            trans_ts = _fast_parse_epoch(timestamp)
+            if trans_ts is None:
+                trans_ts = self._parse_iso_timestamp(timestamp).timestamp()
 
             # Rule 1: high single amount
             if amount > 5000:
@@ -22,7 +63,7 @@ class FraudDetectionEngine:
                 }
 
             # Rule 2: rapid transactions in last minute
-            if self._is_rapid_activity(user_id, trans_time):
+            if self._is_rapid_activity(user_id, trans_ts):
                 return {
                     "is_fraudulent": True,
                     "reason": "Too many transactions in the last minute",
@@ -36,7 +77,7 @@ class FraudDetectionEngine:
                 "risk_score": 0.1,
             }
         except Exception as e:
-            self.logger.error(f"Error analyzing transaction: {e}")
+            self.logger.error("Error analyzing transaction: %s", e)
             # Fail-safe: do not mark fraudulent on analysis error
             return {
                 "is_fraudulent": False,
@@ -44,23 +85,53 @@ class FraudDetectionEngine:
                 "risk_score": 0.5,
             }
 
-    def _is_rapid_activity(self, user_id: str, now_ts: datetime) -> bool:
-        cutoff = now_ts - timedelta(minutes=1)
-        history = self.user_transactions.get(user_id, [])
+    def _sweep_shard(self, index: int, now: float) -> None:
+        """Drop users in one shard not seen for more than five minutes."""
+        lock, shard, last_seen = self._shards[index]
+        idle_cutoff = now - _IDLE_EVICT_SECONDS
+        with lock:
+            self._last_sweep[index] = now
+            idle = [uid for uid, seen in last_seen.items() if seen <= idle_cutoff]
+            for uid in idle:
+                del shard[uid]
+                del last_seen[uid]
+
+    def _is_rapid_activity(self, user_id: str, now_ts: float) -> bool:
+        cutoff = now_ts - 60.0
+        index = hash(user_id) & (_NUM_SHARDS - 1)
+        lock, shard, last_seen = self._shards[index]
+        now = time.monotonic()
+
+        # Bound memory without a background task: each shard sweeps out idle
+        # users at most once per idle window, driven by its own traffic
+        if now - self._last_sweep[index] > _IDLE_EVICT_SECONDS:
+            self._sweep_shard(index, now)
+
+        with lock:
+            last_seen[user_id] = now
+            history = shard.get(user_id)
+            if history is None:
+                history = shard[user_id] = array("d")
 
-        # Keep only last-minute entries
-        history = [t for t in history if t > cutoff]
-        history.append(now_ts)
-        self.user_transactions[user_id] = history
+            # Drop entries older than a minute: one binary search, one slice delete
+            expired = bisect.bisect_right(history, cutoff)
+            if expired:
+                del history[:expired]
+            # Timestamps normally arrive in order; keep the array sorted if not
+            if not history or now_ts >= history[-1]:
+                history.append(now_ts)
+            else:
+                bisect.insort(history, now_ts)
+            count = len(history)
 
         # More than 3 transactions in the last minute → fraudulent
-        return len(history) > 3
+        return count > 3
 
     def _parse_iso_timestamp(self, ts: str) -> datetime:
         # Accepts e.g. "2025-10-24T22:00:00Z" or with offset
         if ts.endswith("Z"):
             ts = ts.replace("Z", "+00:00")
-        dt = datetime.fromisoformat(ts)
+        dt = _fromisoformat(ts)
         if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
+            dt = dt.replace(tzinfo=_UTC)
         return dt
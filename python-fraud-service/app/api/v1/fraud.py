@@ -7,6 +7,8 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 import logging
 
+import numpy as np
+
 from app.schemas.transaction import TransactionAnalysisRequest, TransactionAnalysisResponse
 from app.services.fraud_detector import fraud_service
 from app.services.mongodb_client import mongodb_client
@@ -16,6 +18,26 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Hoisted out of the per-request path (settings are fixed at startup)
+_THRESHOLD = settings.FRAUD_THRESHOLD
+
+
+def _ml_can_change_verdict(rule_score: float) -> bool:
+    """
+    Whether blending in the ML score could flip the fraud verdict.
+
+    The blend is 0.7 * rule + 0.3 * ml with ml in [0, 1]. If even ml=0 is
+    at/over the threshold, or ml=1 stays under it, the verdict is already
+    decided and the model evaluation is skipped.
+
+    A skipped transaction reports its unblended rule score, so the reported
+    risk_score is not monotonic in rule risk: with the default threshold
+    0.7, a rule score of 0.56 is reported as 0.56, while 0.58 with ml=0.2
+    is blended down to 0.466. Only is_fraud is guaranteed to match what the
+    full blend would give.
+    """
+    return round(rule_score * 0.7, 4) < _THRESHOLD <= round(rule_score * 0.7 + 0.3, 4)
+
 
 # ----- Legacy schema (used by the Java service's /detect call) -----
 
@@ -48,12 +70,14 @@ async def analyze_transaction(request: TransactionAnalysisRequest):
     - ML anomaly detection (Isolation Forest)
     """
     try:
-        logger.info("Analyzing transaction: %s", request.transaction_id)
+        # Guarded so production (LOG_LEVEL=WARNING) skips even building the call
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Analyzing transaction: %s", request.transaction_id)
 
         # Run rule-based fraud detection
         result = fraud_service.analyze_transaction(
             transaction_id=request.transaction_id,
-            user_id=str(request.user_id),
+            user_id=request.user_id,
             amount=request.amount,
             transaction_type=request.transaction_type,
             category=request.category,
@@ -62,43 +86,44 @@ async def analyze_transaction(request: TransactionAnalysisRequest):
         )
 
         # Optionally blend in ML model score
-        if model_manager.is_loaded:
-            features = model_manager.extract_features(
-                amount=float(request.amount),
+        if model_manager.is_loaded and _ml_can_change_verdict(result.risk_score):
+            ml_score = model_manager.predict_cached(
+                amount=request.amount,
                 hour_of_day=request.transaction_date.hour if request.transaction_date else 12,
                 day_of_week=request.transaction_date.weekday() if request.transaction_date else 0,
             )
-            ml_score = model_manager.predict(features)
             if ml_score is not None:
                 # Blend: 70% rule-based, 30% ML
-                blended = result["risk_score"] * 0.7 + ml_score * 0.3
-                result["risk_score"] = round(blended, 4)
-                result["is_fraud"] = result["risk_score"] >= settings.FRAUD_THRESHOLD
+                blended = result.risk_score * 0.7 + ml_score * 0.3
+                result.risk_score = round(blended, 4)
+                result.is_fraud = result.risk_score >= _THRESHOLD
 
         # Build response
         response = TransactionAnalysisResponse(
             transaction_id=request.transaction_id,
-            risk_score=result["risk_score"],
-            is_fraud=result["is_fraud"],
-            detected_anomalies=result["detected_anomalies"],
-            confidence=result["confidence"],
-            model_version=result["model_version"],
+            risk_score=result.risk_score,
+            is_fraud=result.is_fraud,
+            detected_anomalies=result.detected_anomalies,
+            confidence=result.confidence,
+            model_version=result.model_version,
         )
 
-        # Persist to MongoDB (non-blocking fire-and-forget)
+        # Persist to MongoDB: queued for the background writer, or written in
+        # a fire-and-forget task if the writer is disabled or its queue is full
         try:
-            await mongodb_client.log_analysis(result)
-            if result["is_fraud"]:
-                await mongodb_client.log_alert(result)
+            doc = result.to_dict()
+            if not mongodb_client.queue_analysis(doc):
+                mongodb_client.log_analysis_async(doc)
         except Exception:
             pass  # Don't let logging failures affect the response
 
-        logger.info(
-            "Transaction %s analyzed: risk_score=%.4f, is_fraud=%s",
-            request.transaction_id,
-            response.risk_score,
-            response.is_fraud,
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Transaction %s analyzed: risk_score=%.4f, is_fraud=%s",
+                request.transaction_id,
+                response.risk_score,
+                response.is_fraud,
+            )
         return response
 
     except Exception as e:
@@ -117,35 +142,73 @@ async def analyze_batch(requests: List[TransactionAnalysisRequest]):
     try:
         logger.info("Analyzing batch of %d transactions", len(requests))
 
-        results = []
-        for req in requests:
-            result = fraud_service.analyze_transaction(
+        # Run rule-based fraud detection for the whole batch in one vectorized pass
+        analyses = fraud_service.analyze_batch([
+            {
+                "transaction_id": req.transaction_id,
+                "user_id": req.user_id,
+                "amount": req.amount,
+                "transaction_type": req.transaction_type,
+                "category": req.category,
+                "transaction_date": req.transaction_date,
+                "description": req.description,
+            }
+            for req in requests
+        ])
+
+        # Blend in ML scores with a single model evaluation, limited to the
+        # transactions whose verdict the model could still change
+        pending: List[int] = []
+        if model_manager.is_loaded:
+            pending = [
+                i for i, r in enumerate(analyses) if _ml_can_change_verdict(r.risk_score)
+            ]
+        if pending:
+            ml_scores = model_manager.predict_many([
+                model_manager.extract_features(
+                    amount=req.amount,
+                    hour_of_day=req.transaction_date.hour if req.transaction_date else 12,
+                    day_of_week=req.transaction_date.weekday() if req.transaction_date else 0,
+                )
+                for req in (requests[i] for i in pending)
+            ])
+            # predict_many scores the whole batch or nothing
+            if ml_scores[0] is not None:
+                rule_scores = np.fromiter(
+                    (analyses[i].risk_score for i in pending), dtype=np.float64, count=len(pending)
+                )
+                # Blend: 70% rule-based, 30% ML, as one vectorized pass. Rounded
+                # with Python's round() like /analyze: np.round breaks exact
+                # halfway ties differently and can flip the verdict
+                blended = rule_scores * 0.7 + np.asarray(ml_scores) * 0.3
+                for i, score in zip(pending, blended.tolist()):
+                    score = round(score, 4)
+                    analyses[i].risk_score = score
+                    analyses[i].is_fraud = score >= _THRESHOLD
+
+        results = [
+            TransactionAnalysisResponse(
                 transaction_id=req.transaction_id,
-                user_id=str(req.user_id),
-                amount=req.amount,
-                transaction_type=req.transaction_type,
-                category=req.category,
-                transaction_date=req.transaction_date,
-                description=req.description,
+                risk_score=result.risk_score,
+                is_fraud=result.is_fraud,
+                detected_anomalies=result.detected_anomalies,
+                confidence=result.confidence,
+                model_version=result.model_version,
             )
+            for req, result in zip(requests, analyses)
+        ]
 
-            response = TransactionAnalysisResponse(
-                transaction_id=req.transaction_id,
-                risk_score=result["risk_score"],
-                is_fraud=result["is_fraud"],
-                detected_anomalies=result["detected_anomalies"],
-                confidence=result["confidence"],
-                model_version=result["model_version"],
-            )
-            results.append(response)
-
-            # Log to MongoDB
-            try:
-                await mongodb_client.log_analysis(result)
-                if result["is_fraud"]:
-                    await mongodb_client.log_alert(result)
-            except Exception:
-                pass
+        # Log to MongoDB: queued for the background writer; whatever cannot be
+        # queued is written in the background with one insert_many
+        try:
+            unqueued = [
+                doc for doc in (r.to_dict() for r in analyses)
+                if not mongodb_client.queue_analysis(doc)
+            ]
+            if unqueued:
+                mongodb_client.log_analyses_bulk_async(unqueued)
+        except Exception:
+            pass
 
         return results
 
@@ -3,8 +3,8 @@ Health check endpoints
 """
 
 from fastapi import APIRouter
-from datetime import datetime, timezone
 
+from app.core.clock import utc_now_iso
 from app.services.mongodb_client import mongodb_client
 from app.ml.model_manager import model_manager
 
@@ -18,7 +18,7 @@ async def health_check():
     """
     return {
         "status": "healthy",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": utc_now_iso(),
         "service": "fraud-detection",
     }
 
@@ -37,7 +37,7 @@ async def readiness_check():
 
     return {
         "status": overall_status,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": utc_now_iso(),
         "checks": {
             "database": db_status,
             "ml_model": ml_status,
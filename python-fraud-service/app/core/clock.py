@@ -0,0 +1,31 @@
+"""
+Coarse UTC clock for per-request timestamps
+"""
+
+import time
+from datetime import datetime, timezone
+
+# Timestamps within this window share one datetime instance
+_RESOLUTION_SECONDS = 0.01
+
+# (monotonic time of last refresh, datetime, isoformat string)
+_cache = (float("-inf"), datetime.min.replace(tzinfo=timezone.utc), "")
+
+
+def _refresh() -> tuple:
+    global _cache
+    now = time.monotonic()
+    if now - _cache[0] > _RESOLUTION_SECONDS:
+        current = datetime.now(timezone.utc)
+        _cache = (now, current, current.isoformat())
+    return _cache
+
+
+def utc_now() -> datetime:
+    """Current UTC time, refreshed at most every 10 ms."""
+    return _refresh()[1]
+
+
+def utc_now_iso() -> str:
+    """utc_now() as an ISO-8601 string."""
+    return _refresh()[2]
@@ -19,17 +19,24 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKERS: int = 1
 
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "fingaurd_fraud"
     MONGODB_MAX_CONNECTIONS: int = 100
     MONGODB_MIN_CONNECTIONS: int = 10
+    MONGODB_WRITE_QUEUE_SIZE: int = 10000  # 0 disables the background writer
+    MONGODB_WRITE_BATCH_SIZE: int = 500
+    MONGODB_WRITE_FLUSH_MS: int = 50
+    MONGODB_MAX_PENDING_WRITES: int = 256  # Cap on fire-and-forget fallback writes
+    MONGODB_ANALYSIS_TTL_DAYS: int = 0  # Expire fraud_analyses after N days; 0 keeps them
 
     # Machine Learning
     ML_MODEL_PATH: str = "./models/fraud_detector.pkl"
     ML_MODEL_VERSION: str = "1.0.0"
     FRAUD_THRESHOLD: float = 0.7  # Risk score threshold for flagging
+    ML_PREDICTION_CACHE_SIZE: int = 16384  # LRU entries for memoized ML scores
 
     # Feature Engineering
     LOOKBACK_DAYS: int = 30  # Days to look back for user transaction history
@@ -6,8 +6,11 @@ rule-based heuristics and machine learning (Isolation Forest).
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional
 import logging
@@ -37,6 +40,8 @@ async def lifespan(app: FastAPI):
     mongo_ok = await mongodb_client.connect()
     if mongo_ok:
         logger.info("MongoDB connection established")
+        # Batch audit writes in the background instead of awaiting them per request
+        mongodb_client.start_writer()
     else:
         logger.info("Running without MongoDB (audit logging disabled)")
 
@@ -61,6 +66,7 @@ app = FastAPI(
     description="Machine learning-based fraud detection for financial transactions",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
 )
@@ -74,6 +80,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """
+    FastAPI's default 422 handler, rendered with orjson: the errors echo the
+    rejected input, and a non-finite amount (JSON 1e400) would make the
+    stdlib-JSON response fail with a 500. orjson writes it as null.
+    """
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
+
 # Include versioned API routers
 app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(fraud.router, prefix="/api/fraud", tags=["fraud"])
@@ -109,11 +126,13 @@ async def legacy_detect(transaction: LegacyTransaction):
 
     # Log to MongoDB
     try:
-        await mongodb_client.log_analysis({
+        analysis = {
             "endpoint": "/detect",
             "user_id": transaction.user_id,
             **result,
-        })
+        }
+        if not mongodb_client.queue_analysis(analysis):
+            mongodb_client.log_analysis_async(analysis)
     except Exception:
         pass
 
@@ -135,7 +154,9 @@ async def receive_audit_log(entry: dict):
     Stores them in the MongoDB audit_logs collection (US-016).
     """
     try:
-        if mongodb_client.is_connected and mongodb_client._db is not None:
+        # Queued for the background writer; written inline as a fallback
+        queued = mongodb_client.enqueue("audit_logs", entry)
+        if not queued and mongodb_client.is_connected and mongodb_client._db is not None:
             await mongodb_client._db.audit_logs.insert_one(entry)
     except Exception:
         pass  # best-effort
@@ -154,12 +175,19 @@ async def root():
 
 
 if __name__ == "__main__":
+    import sys
+
     import uvicorn
 
+    reload = settings.ENVIRONMENT == "development"
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.ENVIRONMENT == "development",
+        reload=reload,
+        workers=None if reload else settings.WORKERS,
+        # libuv event loop and C HTTP parser (uvloop is unavailable on Windows)
+        loop="uvloop" if sys.platform != "win32" else "auto",
+        http="httptools",
         log_level="info",
     )
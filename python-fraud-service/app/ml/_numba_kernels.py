@@ -0,0 +1,121 @@
+"""
+Optional Numba-compiled kernels for the ML pipeline and batch scoring.
+
+Numba is an optional dependency: when it is not installed NUMBA_AVAILABLE
+is False and callers keep using their plain NumPy code paths.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional import for JIT compilation
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba not available; using NumPy fallbacks for ML kernels")
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def build_synth(out, amounts, hours, days):
+        """
+        Fill a preallocated (n, 4) feature matrix in a single pass:
+        amount, hour_of_day, day_of_week, log1p(amount).
+        """
+        for i in prange(amounts.shape[0]):
+            out[i, 0] = amounts[i]
+            out[i, 1] = hours[i]
+            out[i, 2] = days[i]
+            out[i, 3] = math.log1p(amounts[i])
+
+    @njit(cache=True)
+    def score_batch(
+        amounts, hours, velocity, category, pattern, weights,
+        moderate_amount, high_amount, very_high_amount, threshold,
+        amount_out, time_out, risk_out, fraud_out, confidence_out,
+    ):
+        """
+        Fused rule-based batch scorer: amount and time-of-day factors,
+        weighted combination, verdict and confidence in a single pass.
+
+        Mirrors FraudDetectionService's scalar arithmetic operation for
+        operation (no fastmath), so results are bit-identical to it.
+        """
+        for i in range(amounts.shape[0]):
+            amount = amounts[i]
+            if amount >= very_high_amount:
+                a = 1.0
+            elif amount >= high_amount:
+                a = 0.5 + ((amount - high_amount) / (very_high_amount - high_amount)) * 0.5
+            elif amount >= moderate_amount:
+                a = (amount - moderate_amount) / 4000.0 * 0.3
+            else:
+                a = 0.0
+
+            hour = hours[i]
+            if hour < 5:
+                t = 0.8
+            elif hour == 5 or hour == 23:
+                t = 0.4
+            else:
+                t = 0.0
+
+            v = velocity[i]
+            c = category[i]
+            p = pattern[i]
+            risk = (
+                weights[0] * a
+                + weights[1] * t
+                + weights[2] * v
+                + weights[3] * c
+                + weights[4] * p
+            )
+            risk = max(0.0, min(1.0, risk))
+            is_fraud = risk >= threshold
+
+            non_zero = 0
+            if a > 0.1:
+                non_zero += 1
+            if t > 0.1:
+                non_zero += 1
+            if v > 0.1:
+                non_zero += 1
+            if c > 0.1:
+                non_zero += 1
+            if p > 0.1:
+                non_zero += 1
+            if is_fraud:
+                confidence = min(0.99, 0.6 + (non_zero * 0.08))
+            else:
+                confidence = min(0.99, 0.7 + ((5 - non_zero) * 0.06))
+
+            amount_out[i] = a
+            time_out[i] = t
+            risk_out[i] = risk
+            fraud_out[i] = is_fraud
+            confidence_out[i] = confidence
+
+    # Compile at import (service startup) rather than on first use
+    try:
+        build_synth(
+            np.empty((1, 4), dtype=np.float32),
+            np.ones(1, dtype=np.float64),
+            np.ones(1, dtype=np.int64),
+            np.ones(1, dtype=np.int64),
+        )
+        _one = np.ones(1, dtype=np.float64)
+        score_batch(
+            _one, np.ones(1, dtype=np.int64), _one, _one, _one, np.ones(5),
+            1000.0, 5000.0, 25000.0, 0.7,
+            np.empty(1), np.empty(1), np.empty(1), np.empty(1, dtype=np.bool_), np.empty(1),
+        )
+    except Exception as e:
+        NUMBA_AVAILABLE = False
+        logger.warning("Numba kernel compilation failed; using NumPy fallbacks: %s", e)
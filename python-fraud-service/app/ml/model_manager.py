@@ -6,12 +6,16 @@ including loading, prediction, and retraining.
 """
 
 import logging
+import math
 import os
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 import numpy as np
 
 from app.core.config import settings
+from app.ml import _numba_kernels
 
 logger = logging.getLogger(__name__)
 
@@ -36,17 +40,26 @@ class ModelManager:
     - amount_log: Log-transformed amount for better distribution
     """
 
-    FEATURE_NAMES = [
+    FEATURE_NAMES = (
         "amount",
         "hour_of_day",
         "day_of_week",
         "amount_log",
-    ]
+    )
 
     def __init__(self):
         self._model: Optional[Any] = None
         self._loaded = False
         self._version = settings.ML_MODEL_VERSION
+        # Reused single-row input buffer for predict(); predictions run on
+        # the event loop thread, so the buffer is never shared concurrently
+        self._scratch = np.empty((1, len(self.FEATURE_NAMES)), dtype=np.float32)
+        self._score_samples: Optional[Any] = None
+        # Memoized scores keyed on the exact (amount, hour, day) inputs;
+        # cleared whenever a new model is bound
+        self._predict_key = lru_cache(maxsize=settings.ML_PREDICTION_CACHE_SIZE)(
+            self._predict_key_uncached
+        )
 
     @property
     def is_loaded(self) -> bool:
@@ -70,6 +83,7 @@ class ModelManager:
         if os.path.exists(model_path):
             try:
                 self._model = joblib.load(model_path)
+                self._bind_scorer()
                 self._loaded = True
                 logger.info("ML model loaded from %s", model_path)
                 return True
@@ -87,6 +101,7 @@ class ModelManager:
 
         # Train on synthetic normal data so the model can make predictions
         self._train_on_synthetic_data()
+        self._bind_scorer()
         self._loaded = True
 
         # Save the default model
@@ -94,10 +109,12 @@ class ModelManager:
 
         return True
 
-    def predict(self, features: Dict[str, float]) -> Optional[float]:
+    def predict(self, features: np.ndarray) -> Optional[float]:
         """
         Predict anomaly score for a single transaction.
 
+        ``features`` is the positional vector from extract_features().
+
         Returns a score between 0 and 1 where higher = more anomalous,
         or None if the model is not available.
         """
@@ -105,11 +122,11 @@ class ModelManager:
             return None
 
         try:
-            feature_vector = np.array(
-                [[features.get(name, 0.0) for name in self.FEATURE_NAMES]]
-            )
-            # Isolation Forest returns -1 for anomalies, 1 for normal
-            raw_score = self._model.decision_function(feature_vector)[0]
+            scratch = self._scratch
+            scratch[0, :] = features
+            # Same value as decision_function (negative = anomalous), minus
+            # sklearn's per-call input validation
+            raw_score = self._score_samples(scratch)[0] - self._model.offset_
             # Convert to 0-1 scale: more negative = higher anomaly score
             # decision_function returns values roughly in [-0.5, 0.5] range
             anomaly_score = max(0.0, min(1.0, 0.5 - raw_score))
@@ -119,25 +136,75 @@ class ModelManager:
             logger.error("ML prediction error: %s", e)
             return None
 
+    def predict_cached(
+        self,
+        amount: float,
+        hour_of_day: int,
+        day_of_week: int,
+    ) -> Optional[float]:
+        """
+        predict() on extract_features(), memoized per (amount, hour, day of
+        week) in an LRU cache so repeated inputs skip walking the forest.
+
+        The key is the exact input, so the score always equals what
+        predict_many() returns for the same transaction.
+        """
+        if not self._loaded or self._model is None:
+            return None
+        return self._predict_key(amount, hour_of_day, day_of_week)
+
+    def _predict_key_uncached(
+        self, amount: float, hour_of_day: int, day_of_week: int
+    ) -> Optional[float]:
+        return self.predict(self.extract_features(amount, hour_of_day, day_of_week))
+
+    def predict_many(self, features_list: List[np.ndarray]) -> List[Optional[float]]:
+        """
+        Predict anomaly scores for a batch of transactions.
+
+        Stacks all feature vectors into a single (N, 4) matrix so the
+        Isolation Forest is evaluated with one decision_function call
+        instead of one call per transaction.
+        """
+        if not self._loaded or self._model is None or not features_list:
+            return [None] * len(features_list)
+
+        try:
+            X = np.stack(features_list)
+            raw_scores = self._score_samples(X) - self._model.offset_
+            anomaly_scores = np.round(np.clip(0.5 - raw_scores, 0.0, 1.0), 4)
+            return anomaly_scores.tolist()
+
+        except Exception as e:
+            logger.error("ML batch prediction error: %s", e)
+            return [None] * len(features_list)
+
     def extract_features(
         self,
         amount: float,
         hour_of_day: int,
         day_of_week: int,
-    ) -> Dict[str, float]:
+    ) -> np.ndarray:
         """
         Extract the feature vector for a transaction.
+
+        Returns a float32 array of shape (4,) ordered as FEATURE_NAMES.
         """
-        return {
-            "amount": amount,
-            "hour_of_day": float(hour_of_day),
-            "day_of_week": float(day_of_week),
-            "amount_log": float(np.log1p(abs(amount))),
-        }
+        # math.log1p: np.log1p on a Python scalar pays for a 0-d ufunc call
+        return np.array(
+            [amount, hour_of_day, day_of_week, math.log1p(abs(amount))],
+            dtype=np.float32,
+        )
 
-    async def retrain(self, training_data: List[Dict[str, float]]) -> bool:
+    async def retrain(
+        self, training_data: Union[np.ndarray, Sequence[np.ndarray], Sequence[Dict[str, float]]]
+    ) -> bool:
         """
         Retrain the model with new data.
+
+        ``training_data`` may be an (N, 4) array or DataFrame with columns
+        in FEATURE_NAMES order, a sequence of extract_features() vectors,
+        or a sequence of feature dicts keyed by FEATURE_NAMES.
         """
         if not SKLEARN_AVAILABLE:
             logger.warning("Cannot retrain: scikit-learn not available")
@@ -152,9 +219,7 @@ class ModelManager:
             return False
 
         try:
-            X = np.array(
-                [[d.get(name, 0.0) for name in self.FEATURE_NAMES] for d in training_data]
-            )
+            X = self._training_matrix(training_data)
 
             self._model = IsolationForest(
                 n_estimators=100,
@@ -163,6 +228,7 @@ class ModelManager:
                 n_jobs=-1,
             )
             self._model.fit(X)
+            self._bind_scorer()
             self._loaded = True
 
             self._save_model()
@@ -179,11 +245,45 @@ class ModelManager:
             "model_version": self._version,
             "model_type": "Isolation Forest",
             "is_loaded": self._loaded,
-            "features": self.FEATURE_NAMES,
+            "features": list(self.FEATURE_NAMES),
             "threshold": settings.FRAUD_THRESHOLD,
             "sklearn_available": SKLEARN_AVAILABLE,
         }
 
+    def _training_matrix(self, training_data: Any) -> np.ndarray:
+        """Convert retrain() input to a float32 (N, 4) matrix with minimal copying."""
+        if hasattr(training_data, "columns"):
+            # pandas DataFrame: select the known columns in feature order
+            return training_data[list(self.FEATURE_NAMES)].to_numpy(dtype=np.float32)
+        if isinstance(training_data, np.ndarray):
+            n_features = len(self.FEATURE_NAMES)
+            if training_data.ndim != 2 or training_data.shape[1] != n_features:
+                raise ValueError(
+                    f"Expected shape (N, {n_features}), got {training_data.shape}"
+                )
+            return training_data.astype(np.float32, copy=False)
+        if isinstance(training_data[0], dict):
+            # One pass over all values into a single preallocated buffer
+            names = self.FEATURE_NAMES
+            return np.fromiter(
+                chain.from_iterable((d.get(name, 0.0) for name in names) for d in training_data),
+                dtype=np.float32,
+                count=len(training_data) * len(names),
+            ).reshape(-1, len(names))
+        return np.stack(training_data).astype(np.float32, copy=False)
+
+    def _bind_scorer(self):
+        """
+        Cache the model's unvalidated scoring entry point.
+
+        IsolationForest.score_samples only validates its input before
+        delegating to _score_samples; our inputs are always well-formed
+        float32 arrays, so call the private method directly when the
+        installed scikit-learn provides it.
+        """
+        self._score_samples = getattr(self._model, "_score_samples", self._model.score_samples)
+        self._predict_key.cache_clear()
+
     def _train_on_synthetic_data(self):
         """Train on synthetic normal transaction data."""
         rng = np.random.RandomState(42)
@@ -193,9 +293,18 @@ class ModelManager:
         amounts = rng.lognormal(mean=4.0, sigma=1.5, size=n_samples)  # ~$55 median
         hours = rng.choice(range(8, 22), size=n_samples)  # Business hours
         days = rng.choice(range(0, 7), size=n_samples)
-        amount_logs = np.log1p(amounts)
 
-        X = np.column_stack([amounts, hours, days, amount_logs])
+        # float32 is the dtype the forest itself works in, so fit() uses X as-is
+        X = np.empty((n_samples, 4), dtype=np.float32)
+        if _numba_kernels.NUMBA_AVAILABLE:
+            # Fused single-pass fill of the preallocated matrix
+            _numba_kernels.build_synth(X, amounts, hours, days)
+        else:
+            X[:, 0] = amounts
+            X[:, 1] = hours
+            X[:, 2] = days
+            X[:, 3] = np.log1p(amounts)
+
         self._model.fit(X)
         logger.info("Model trained on %d synthetic samples", n_samples)
 
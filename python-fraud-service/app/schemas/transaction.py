@@ -2,47 +2,73 @@
 Transaction-related Pydantic schemas
 """
 
-from pydantic import BaseModel, Field, UUID4
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
-from datetime import datetime, timezone
-from decimal import Decimal
+from datetime import datetime
+import re
+import uuid
+
+from app.core.clock import utc_now
+
+# Canonical (lower-case, hyphenated) UUID version 4
+_UUID4_MATCH = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
+).match
 
 
 class TransactionAnalysisRequest(BaseModel):
     """
     Request model for transaction fraud analysis
+
+    IDs are kept as plain strings checked against a precompiled UUID4 pattern
+    and the amount is a float, so parsing stays on pydantic-core's native
+    validators instead of the Python-level UUID/Decimal ones. Other UUID
+    spellings (32 hex digits, braces, urn:uuid:) are still accepted and
+    normalized to the canonical form.
     """
-    transaction_id: UUID4 = Field(..., description="Unique transaction identifier")
-    user_id: UUID4 = Field(..., description="User ID who made the transaction")
-    amount: Decimal = Field(..., gt=0, description="Transaction amount")
+    transaction_id: str = Field(..., description="Unique transaction identifier (UUID4)")
+    user_id: str = Field(..., description="User ID who made the transaction (UUID4)")
+    amount: float = Field(..., gt=0, allow_inf_nan=False, description="Transaction amount")
     transaction_type: str = Field(..., description="INCOME or EXPENSE")
     category: str = Field(..., description="Transaction category")
     transaction_date: datetime = Field(..., description="Transaction timestamp")
     description: Optional[str] = Field(None, description="Transaction description")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
-                "transaction_id": "123e4567-e89b-12d3-a456-426614174000",
-                "user_id": "987e6543-e21b-12d3-a456-426614174111",
+                "transaction_id": "123e4567-e89b-42d3-a456-426614174000",
+                "user_id": "987e6543-e21b-42d3-a456-426614174111",
                 "amount": 150.00,
                 "transaction_type": "EXPENSE",
                 "category": "groceries",
                 "transaction_date": "2025-10-09T14:30:00Z",
                 "description": "Weekly grocery shopping"
             }
-        }
-
+        },
+    )
 
-def _utc_now() -> datetime:
-    return datetime.now(timezone.utc)
+    @field_validator("transaction_id", "user_id")
+    @classmethod
+    def _check_uuid4(cls, value: str) -> str:
+        value = value.lower()
+        if _UUID4_MATCH(value) is not None:
+            return value
+        # Non-canonical spellings take the slower uuid.UUID parse
+        try:
+            parsed = uuid.UUID(value)
+        except ValueError:
+            raise ValueError("must be a valid UUID4") from None
+        if parsed.version != 4:
+            raise ValueError("must be a valid UUID4")
+        return str(parsed)
 
 
 class TransactionAnalysisResponse(BaseModel):
     """
     Response model for transaction fraud analysis
     """
-    transaction_id: UUID4 = Field(..., description="Transaction identifier")
+    transaction_id: str = Field(..., description="Transaction identifier")
     risk_score: float = Field(..., ge=0, le=1, description="Fraud risk score (0-1)")
     is_fraud: bool = Field(..., description="Whether transaction is flagged as fraud")
     detected_anomalies: List[str] = Field(
@@ -51,12 +77,12 @@ class TransactionAnalysisResponse(BaseModel):
     )
     confidence: float = Field(..., ge=0, le=1, description="Model confidence score")
     model_version: str = Field(..., description="Version of ML model used")
-    analyzed_at: datetime = Field(default_factory=_utc_now)
+    analyzed_at: datetime = Field(default_factory=utc_now)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
-                "transaction_id": "123e4567-e89b-12d3-a456-426614174000",
+                "transaction_id": "123e4567-e89b-42d3-a456-426614174000",
                 "risk_score": 0.15,
                 "is_fraud": False,
                 "detected_anomalies": [],
@@ -64,5 +90,6 @@ class TransactionAnalysisResponse(BaseModel):
                 "model_version": "1.0.0",
                 "analyzed_at": "2025-10-09T14:30:05Z"
             }
-        }
+        },
+    )
 
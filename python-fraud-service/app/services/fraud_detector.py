@@ -4,16 +4,115 @@ Fraud Detection Service
 Implements rule-based and ML-assisted fraud detection for financial transactions.
 """
 
+import bisect
 import logging
-from datetime import datetime, timedelta, timezone
-from decimal import Decimal
-from typing import Dict, List, Optional
-from uuid import UUID
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from app.core.config import settings
+from app.ml import _numba_kernels
 
 logger = logging.getLogger(__name__)
 
+# Hoisted out of the per-transaction path (settings are fixed at startup)
+_THRESHOLD = settings.FRAUD_THRESHOLD
+_MODEL_VERSION = settings.ML_MODEL_VERSION
+
+# Per-user velocity history is split across independently locked shards
+# (power of two)
+_NUM_SHARDS = 64
+
+# Verdict and confidence when no factor fires (see analyze_transaction)
+_ZERO_RISK_IS_FRAUD = 0.0 >= _THRESHOLD
+_ZERO_RISK_CONFIDENCE = round(
+    min(0.99, 0.6) if _ZERO_RISK_IS_FRAUD else min(0.99, 0.7 + 5 * 0.06), 4
+)
+
+# Suspicious description keywords, matched as substrings in one regex scan.
+# The lookahead reports overlapping hits too, so counting the distinct
+# matches gives the same result as testing each keyword with ``in``.
+_SUSPICIOUS_WORDS = (
+    "urgent", "wire", "bitcoin", "crypto", "offshore",
+    "anonymous", "untraceable", "dark", "hack",
+)
+_SUSPICIOUS_RE = re.compile("(?=(" + "|".join(_SUSPICIOUS_WORDS) + "))")
+
+
+def _build_combine(w_amount, w_time, w_velocity, w_category, w_pattern):
+    """
+    Generate combine(a, t, v, c, p): the weighted sum of the five factor
+    scores, clamped to [0, 1], with the weights compiled in as constants.
+
+    The weights are fixed class constants, so baking them into the bytecode
+    replaces five attribute lookups per transaction. repr() round-trips each
+    float exactly and the terms are summed in the same order as the batch
+    paths, so results are unchanged.
+    """
+    source = (
+        "def combine(a, t, v, c, p):\n"
+        f"    risk = ({float(w_amount)!r} * a + {float(w_time)!r} * t"
+        f" + {float(w_velocity)!r} * v + {float(w_category)!r} * c"
+        f" + {float(w_pattern)!r} * p)\n"
+        "    return max(0.0, min(1.0, risk))\n"
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return namespace["combine"]
+
+
+@dataclass(slots=True)
+class FraudResult:
+    """
+    Outcome of a fraud analysis.
+
+    The per-factor scores are None when analysis failed. to_dict() gives
+    the dict form (with a "details" breakdown) used for MongoDB logging.
+    """
+
+    transaction_id: Optional[str]
+    risk_score: float
+    is_fraud: bool
+    detected_anomalies: List[str]
+    confidence: float
+    model_version: str
+    amount_score: Optional[float] = None
+    time_score: Optional[float] = None
+    velocity_score: Optional[float] = None
+    category_score: Optional[float] = None
+    pattern_score: Optional[float] = None
+
+    @property
+    def details(self) -> Dict[str, float]:
+        """Per-factor breakdown; empty when analysis failed."""
+        if self.amount_score is None:
+            return {}
+        return {
+            "amount": self.amount_score,
+            "time_of_day": self.time_score,
+            "velocity": self.velocity_score,
+            "category": self.category_score,
+            "pattern": self.pattern_score,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "transaction_id": self.transaction_id,
+            "risk_score": self.risk_score,
+            "is_fraud": self.is_fraud,
+            "detected_anomalies": self.detected_anomalies,
+            "confidence": self.confidence,
+            "model_version": self.model_version,
+            "details": self.details,
+        }
+
 
 class FraudDetectionService:
     """
@@ -25,8 +124,16 @@ class FraudDetectionService:
     - Category risk scoring
     """
 
-    # In-memory tracking for transaction velocity per user
-    _user_transactions: Dict[str, List[datetime]] = {}
+    # In-memory tracking for transaction velocity per user: sorted epoch-second
+    # floats (oldest first), kept in least-recently-active order so each
+    # shard can be bounded. Alongside, the time.monotonic() each user was
+    # last seen: idle eviction must not trust client-supplied dates. Sharded
+    # by hash(user_id) so different users rarely share a lock
+    _velocity_shards: "List[Tuple[threading.Lock, OrderedDict[str, deque], Dict[str, float]]]" = [
+        (threading.Lock(), OrderedDict(), {}) for _ in range(_NUM_SHARDS)
+    ]
+    # Calls seen by each shard, to schedule its idle sweeps
+    _shard_calls: List[int] = [0] * _NUM_SHARDS
 
     # Risk weights for combining factors
     WEIGHT_AMOUNT = 0.30
@@ -34,138 +141,295 @@ class FraudDetectionService:
     WEIGHT_VELOCITY = 0.25
     WEIGHT_CATEGORY = 0.15
     WEIGHT_PATTERN = 0.15
+    _combine = staticmethod(_build_combine(
+        WEIGHT_AMOUNT, WEIGHT_TIME, WEIGHT_VELOCITY, WEIGHT_CATEGORY, WEIGHT_PATTERN
+    ))
 
     # Thresholds
-    HIGH_AMOUNT_THRESHOLD = Decimal("5000.00")
-    VERY_HIGH_AMOUNT_THRESHOLD = Decimal("25000.00")
+    HIGH_AMOUNT_THRESHOLD = 5000.00
+    VERY_HIGH_AMOUNT_THRESHOLD = 25000.00
+    MODERATE_AMOUNT_THRESHOLD = 1000.00
     VELOCITY_WINDOW_SECONDS = 60
     VELOCITY_MAX_TRANSACTIONS = 3
+    MAX_TRACKED_USERS = 100_000
+    VELOCITY_SWEEP_INTERVAL = 1024
 
     # High-risk categories
-    HIGH_RISK_CATEGORIES = {
+    HIGH_RISK_CATEGORIES = frozenset({
         "cryptocurrency", "gambling", "adult services",
         "cash advance", "international transfer", "wire transfer",
-    }
+    })
 
-    MEDIUM_RISK_CATEGORIES = {
+    MEDIUM_RISK_CATEGORIES = frozenset({
         "investment", "foreign exchange", "money order",
         "peer transfer", "gift card",
+    })
+
+    # Time-of-day risk by UTC hour: highest from midnight to 5 AM, moderate
+    # 5-6 AM and 11 PM-midnight
+    _HOUR_RISK = (0.8,) * 5 + (0.4,) + (0.0,) * 17 + (0.4,)
+    _HOUR_RISK_ARRAY = np.array(_HOUR_RISK)
+
+    # Normalized category -> score, so scoring is a single dict lookup
+    _CATEGORY_SCORES = {
+        **dict.fromkeys(MEDIUM_RISK_CATEGORIES, 0.4),
+        **dict.fromkeys(HIGH_RISK_CATEGORIES, 0.9),
     }
 
     def analyze_transaction(
         self,
-        transaction_id: Optional[UUID],
+        transaction_id: Optional[str],
         user_id: str,
-        amount: Decimal,
+        amount: float,
         transaction_type: str = "EXPENSE",
         category: str = "",
         transaction_date: Optional[datetime] = None,
         description: Optional[str] = None,
-    ) -> dict:
+    ) -> FraudResult:
         """
         Analyze a single transaction for fraud.
 
-        Returns a dict with:
+        Returns a FraudResult with:
             - risk_score (float): 0.0 to 1.0
             - is_fraud (bool): True if risk_score >= threshold
             - detected_anomalies (list[str]): Human-readable risk factors
             - confidence (float): Confidence in the assessment
-            - details (dict): Per-factor breakdown
+            - *_score (float): Per-factor breakdown
+
+        Inputs are validated at the API boundary, so errors propagate to the
+        caller rather than being reported as a zero-risk result.
         """
-        try:
-            if transaction_date is None:
-                transaction_date = datetime.now(timezone.utc)
-            elif transaction_date.tzinfo is None:
-                transaction_date = transaction_date.replace(tzinfo=timezone.utc)
+        # Scored as a native float throughout; Decimal arithmetic was
+        # the dominant per-call cost and every factor ended in float()
+        amount = float(amount)
+
+        txn_ts, hour, minute = self._resolve_time(transaction_date)
+
+        # Factor 3 first: velocity history must be updated for every call
+        velocity_score = self._score_velocity(user_id, txn_ts)
+
+        # Fast path for the common case where every factor scores zero
+        if velocity_score == 0.0 and self._is_zero_risk(amount, hour, category, description):
+            return self._zero_risk_result(transaction_id)
+
+        anomalies: List[str] = []
+
+        # Factor 1: Amount risk
+        amount_score = self._score_amount(amount)
+        if amount_score > 0.3:
+            anomalies.append(f"High transaction amount: ${amount:.2f}")
+
+        # Factor 2: Time-of-day risk
+        time_score = self._score_time(hour)
+        if time_score > 0.3:
+            anomalies.append(f"Suspicious transaction time: {hour:02d}:{minute:02d} UTC")
+
+        # Factor 3: Transaction velocity
+        if velocity_score > 0.3:
+            anomalies.append("Rapid transaction activity detected")
+
+        # Factor 4: Category risk
+        category_score = self._score_category(category)
+        if category_score > 0.3:
+            anomalies.append(f"High-risk category: {category}")
+
+        # Factor 5: Pattern / description analysis
+        pattern_score = self._score_pattern(description, amount)
+        if pattern_score > 0.3:
+            anomalies.append("Suspicious transaction pattern")
+
+        # Weighted combination, clamped to [0, 1]
+        risk_score = self._combine(
+            amount_score, time_score, velocity_score, category_score, pattern_score
+        )
+
+        is_fraud = risk_score >= _THRESHOLD
+
+        # Confidence is higher when more factors agree
+        non_zero_factors = (
+            (amount_score > 0.1)
+            + (time_score > 0.1)
+            + (velocity_score > 0.1)
+            + (category_score > 0.1)
+            + (pattern_score > 0.1)
+        )
+        if is_fraud:
+            confidence = min(0.99, 0.6 + (non_zero_factors * 0.08))
+        else:
+            confidence = min(0.99, 0.7 + ((5 - non_zero_factors) * 0.06))
+
+        result = FraudResult(
+            transaction_id=str(transaction_id) if transaction_id else None,
+            risk_score=round(risk_score, 4),
+            is_fraud=is_fraud,
+            detected_anomalies=anomalies,
+            confidence=round(confidence, 4),
+            model_version=_MODEL_VERSION,
+            amount_score=amount_score,
+            time_score=time_score,
+            velocity_score=velocity_score,
+            category_score=category_score,
+            pattern_score=pattern_score,
+        )
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Transaction %s analyzed: risk_score=%.4f, is_fraud=%s, anomalies=%d",
+                transaction_id,
+                risk_score,
+                is_fraud,
+                len(anomalies),
+            )
 
-            anomalies: List[str] = []
-            factor_scores: Dict[str, float] = {}
-
-            # Factor 1: Amount risk
-            amount_score = self._score_amount(amount)
-            factor_scores["amount"] = amount_score
-            if amount_score > 0.3:
-                anomalies.append(f"High transaction amount: ${amount}")
-
-            # Factor 2: Time-of-day risk
-            time_score = self._score_time(transaction_date)
-            factor_scores["time_of_day"] = time_score
-            if time_score > 0.3:
-                anomalies.append(
-                    f"Suspicious transaction time: {transaction_date.strftime('%H:%M')} UTC"
-                )
+        return result
 
-            # Factor 3: Transaction velocity
-            velocity_score = self._score_velocity(user_id, transaction_date)
-            factor_scores["velocity"] = velocity_score
-            if velocity_score > 0.3:
-                anomalies.append("Rapid transaction activity detected")
+    def analyze_batch(self, txns: List[Dict[str, Any]]) -> List[FraudResult]:
+        """
+        Analyze a batch of transactions.
 
-            # Factor 4: Category risk
-            category_score = self._score_category(category)
-            factor_scores["category"] = category_score
-            if category_score > 0.3:
-                anomalies.append(f"High-risk category: {category}")
+        Each dict holds the analyze_transaction() keyword arguments. The
+        amount, time-of-day and category factors and the weighted
+        combination are computed as array operations over the whole batch;
+        velocity (per-user state) and pattern (free text) are still scored
+        row by row, in input order. Results are identical to calling
+        analyze_transaction() for each transaction in turn.
 
-            # Factor 5: Pattern / description analysis
-            pattern_score = self._score_pattern(description, amount)
-            factor_scores["pattern"] = pattern_score
-            if pattern_score > 0.3:
-                anomalies.append("Suspicious transaction pattern")
+        Rows are checked before the vectorized pass, so a malformed row
+        gets the error result on its own instead of failing the batch.
+        """
+        if not txns:
+            return []
+
+        results: List[Optional[FraudResult]] = [None] * len(txns)
+        # Transactions without a date share one "now"
+        now_ts = time.time()
+        rows = []
+        for i, txn in enumerate(txns):
+            try:
+                rows.append((i, txn, *self._prepare_batch_row(txn, now_ts)))
+            except Exception as e:
+                logger.error(
+                    "Invalid transaction %s in batch: %s", txn.get("transaction_id"), e
+                )
+                results[i] = self._error_result(txn.get("transaction_id"))
 
-            # Weighted combination
-            risk_score = (
-                self.WEIGHT_AMOUNT * amount_score
-                + self.WEIGHT_TIME * time_score
-                + self.WEIGHT_VELOCITY * velocity_score
-                + self.WEIGHT_CATEGORY * category_score
-                + self.WEIGHT_PATTERN * pattern_score
-            )
+        if rows:
+            try:
+                for i, result in self._score_batch_rows(rows):
+                    results[i] = result
+            except Exception as e:
+                logger.error("Error analyzing batch of %d transactions: %s", len(rows), e)
+                for i, txn, *_ in rows:
+                    results[i] = self._error_result(txn.get("transaction_id"))
 
-            # Clamp to [0, 1]
-            risk_score = max(0.0, min(1.0, risk_score))
+        return results
 
-            is_fraud = risk_score >= settings.FRAUD_THRESHOLD
+    def _prepare_batch_row(self, txn: Dict[str, Any], now_ts: float) -> tuple:
+        """
+        Validate and coerce one analyze_batch() row.
 
-            # Confidence is higher when more factors agree
-            non_zero_factors = sum(1 for s in factor_scores.values() if s > 0.1)
-            if is_fraud:
-                confidence = min(0.99, 0.6 + (non_zero_factors * 0.08))
-            else:
-                confidence = min(0.99, 0.7 + ((5 - non_zero_factors) * 0.06))
-
-            result = {
-                "transaction_id": str(transaction_id) if transaction_id else None,
-                "risk_score": round(risk_score, 4),
-                "is_fraud": is_fraud,
-                "detected_anomalies": anomalies,
-                "confidence": round(confidence, 4),
-                "model_version": settings.ML_MODEL_VERSION,
-                "details": factor_scores,
-            }
+        Returns (user_id, epoch seconds, hour, minute, amount, category,
+        description); raises for anything the vectorized pass could not score.
+        """
+        amount = float(txn["amount"])
+        if not math.isfinite(amount):
+            raise ValueError(f"amount must be finite, got {amount}")
+        category = txn.get("category", "")
+        description = txn.get("description")
+        for name, value in (("category", category), ("description", description)):
+            if value is not None and not isinstance(value, str):
+                raise TypeError(f"{name} must be a string, got {type(value).__name__}")
+        return (
+            txn["user_id"],
+            *self._resolve_time(txn.get("transaction_date"), now_ts),
+            amount,
+            category,
+            description,
+        )
+
+    def _score_batch_rows(self, rows: List[tuple]) -> List[Tuple[int, FraudResult]]:
+        """
+        Vectorized scoring of the rows prepared by analyze_batch(): (index,
+        txn) followed by the _prepare_batch_row() fields.
+        """
+        n = len(rows)
+        (_, _, user_ids, timestamps, hour_list, _, amount_list, categories,
+         descriptions) = zip(*rows)
+
+        amounts = np.array(amount_list, dtype=np.float64)
+        hours = np.fromiter(hour_list, dtype=np.int64, count=n)
+
+        # Factor 3: Transaction velocity (stateful, in input order)
+        velocity_scores = np.fromiter(
+            (self._score_velocity(u, ts) for u, ts in zip(user_ids, timestamps)),
+            dtype=np.float64,
+            count=n,
+        )
+
+        # Factor 4: Category risk, scored once per distinct category
+        category_lookup = {c: self._score_category(c) for c in set(categories)}
+        category_scores = np.fromiter(
+            (category_lookup[c] for c in categories), dtype=np.float64, count=n
+        )
+
+        # Factor 5: Pattern / description analysis
+        pattern_scores = np.fromiter(
+            (self._score_pattern(d, a) for d, a in zip(descriptions, amount_list)),
+            dtype=np.float64,
+            count=n,
+        )
+
+        # Factors 1-2, weighted combination, verdict and confidence
+        combine = (
+            self._combine_batch_numba
+            if _numba_kernels.NUMBA_AVAILABLE
+            else self._combine_batch_numpy
+        )
+        amount_scores, time_scores, risk_scores, is_fraud, confidences = combine(
+            amounts, hours, velocity_scores, category_scores, pattern_scores
+        )
+
+        scored = []
+        for row, a, t, v, c, p, risk, fraud, conf in zip(
+            rows,
+            amount_scores.tolist(), time_scores.tolist(), velocity_scores.tolist(),
+            category_scores.tolist(), pattern_scores.tolist(),
+            risk_scores.tolist(), is_fraud.tolist(), confidences.tolist(),
+        ):
+            i, txn, _, _, hour, minute, amount, category, _ = row
+            anomalies: List[str] = []
+            if a > 0.3:
+                anomalies.append(f"High transaction amount: ${amount:.2f}")
+            if t > 0.3:
+                anomalies.append(f"Suspicious transaction time: {hour:02d}:{minute:02d} UTC")
+            if v > 0.3:
+                anomalies.append("Rapid transaction activity detected")
+            if c > 0.3:
+                anomalies.append(f"High-risk category: {category}")
+            if p > 0.3:
+                anomalies.append("Suspicious transaction pattern")
 
+            transaction_id = txn.get("transaction_id")
+            scored.append((i, FraudResult(
+                transaction_id=str(transaction_id) if transaction_id else None,
+                # Python round() per value, matching the scalar path exactly
+                risk_score=round(risk, 4),
+                is_fraud=fraud,
+                detected_anomalies=anomalies,
+                confidence=round(conf, 4),
+                model_version=_MODEL_VERSION,
+                amount_score=a,
+                time_score=t,
+                velocity_score=v,
+                category_score=c,
+                pattern_score=p,
+            )))
+
+        if logger.isEnabledFor(logging.INFO):
             logger.info(
-                "Transaction %s analyzed: risk_score=%.4f, is_fraud=%s, anomalies=%d",
-                transaction_id,
-                risk_score,
-                is_fraud,
-                len(anomalies),
+                "Batch of %d transactions analyzed: %d flagged", n, int(is_fraud.sum())
             )
-
-            return result
-
-        except Exception as e:
-            logger.error("Error analyzing transaction %s: %s", transaction_id, e)
-            # Fail-safe: do not flag as fraud on analysis error
-            return {
-                "transaction_id": str(transaction_id) if transaction_id else None,
-                "risk_score": 0.0,
-                "is_fraud": False,
-                "detected_anomalies": ["Analysis error occurred"],
-                "confidence": 0.0,
-                "model_version": settings.ML_MODEL_VERSION,
-                "details": {},
-            }
+        return scored
 
     def analyze_legacy(
         self, user_id: int, amount: float, timestamp: str
@@ -184,26 +448,24 @@ class FraudDetectionService:
             try:
                 dt = datetime.fromisoformat(ts)
             except Exception:
-                dt = datetime.now(timezone.utc)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
+                dt = None  # analyze_transaction() scores it as "now"
 
             result = self.analyze_transaction(
                 transaction_id=None,
                 user_id=str(user_id),
-                amount=Decimal(str(amount)),
+                amount=float(amount),
                 transaction_date=dt,
             )
 
             # Map to legacy response format
             reason = None
-            if result["detected_anomalies"]:
-                reason = "; ".join(result["detected_anomalies"])
+            if result.detected_anomalies:
+                reason = "; ".join(result.detected_anomalies)
 
             return {
-                "is_fraudulent": result["is_fraud"],
+                "is_fraudulent": result.is_fraud,
                 "reason": reason,
-                "risk_score": result["risk_score"],
+                "risk_score": result.risk_score,
             }
 
         except Exception as e:
@@ -216,44 +478,215 @@ class FraudDetectionService:
 
     # ---- Private scoring methods ----
 
-    def _score_amount(self, amount: Decimal) -> float:
+    @staticmethod
+    def _error_result(transaction_id: Optional[str]) -> FraudResult:
+        """Fail-safe result: do not flag as fraud on analysis error."""
+        return FraudResult(
+            transaction_id=str(transaction_id) if transaction_id else None,
+            risk_score=0.0,
+            is_fraud=False,
+            detected_anomalies=["Analysis error occurred"],
+            confidence=0.0,
+            model_version=_MODEL_VERSION,
+        )
+
+    def _is_zero_risk(
+        self, amount: float, hour: int, category: str, description: Optional[str]
+    ) -> bool:
+        """
+        Whether the amount, time, category and pattern factors all score
+        zero, checked without running the scorers.
+        """
+        return (
+            amount < self.MODERATE_AMOUNT_THRESHOLD
+            and 6 <= hour < 23
+            and not description
+            # Round amounts over 100 get a small pattern score
+            and (amount <= 100.0 or not amount.is_integer())
+            and (not category or category.lower().strip() not in self._CATEGORY_SCORES)
+        )
+
+    @staticmethod
+    def _zero_risk_result(transaction_id: Optional[str]) -> FraudResult:
+        """Result of the full analysis when every factor scores zero."""
+        return FraudResult(
+            transaction_id=str(transaction_id) if transaction_id else None,
+            risk_score=0.0,
+            is_fraud=_ZERO_RISK_IS_FRAUD,
+            detected_anomalies=[],
+            confidence=_ZERO_RISK_CONFIDENCE,
+            model_version=_MODEL_VERSION,
+            amount_score=0.0,
+            time_score=0.0,
+            velocity_score=0.0,
+            category_score=0.0,
+            pattern_score=0.0,
+        )
+
+    @staticmethod
+    def _resolve_time(
+        transaction_date: Optional[datetime], now_ts: Optional[float] = None
+    ) -> Tuple[float, int, int]:
+        """
+        Return (epoch seconds, hour, minute) for a transaction.
+
+        Naive datetimes are taken as UTC. A missing date means now (or
+        now_ts if given), read from time.time() without building a datetime.
+        """
+        if transaction_date is None:
+            if now_ts is None:
+                now_ts = time.time()
+            seconds = int(now_ts)
+            return now_ts, seconds // 3600 % 24, seconds // 60 % 60
+        if transaction_date.tzinfo is None:
+            transaction_date = transaction_date.replace(tzinfo=timezone.utc)
+        return transaction_date.timestamp(), transaction_date.hour, transaction_date.minute
+
+    def _combine_batch_numpy(
+        self,
+        amounts: np.ndarray,
+        hours: np.ndarray,
+        velocity_scores: np.ndarray,
+        category_scores: np.ndarray,
+        pattern_scores: np.ndarray,
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Score amount and time-of-day for a batch and combine all factors.
+
+        Returns (amount_scores, time_scores, risk_scores, is_fraud,
+        confidences) as arrays.
+        """
+        # Factor 1: Amount risk
+        amount_scores = np.select(
+            [
+                amounts >= self.VERY_HIGH_AMOUNT_THRESHOLD,
+                amounts >= self.HIGH_AMOUNT_THRESHOLD,
+                amounts >= self.MODERATE_AMOUNT_THRESHOLD,
+            ],
+            [
+                1.0,
+                0.5
+                + ((amounts - self.HIGH_AMOUNT_THRESHOLD)
+                   / (self.VERY_HIGH_AMOUNT_THRESHOLD - self.HIGH_AMOUNT_THRESHOLD))
+                * 0.5,
+                (amounts - self.MODERATE_AMOUNT_THRESHOLD) / 4000.0 * 0.3,
+            ],
+            default=0.0,
+        )
+
+        # Factor 2: Time-of-day risk
+        time_scores = self._HOUR_RISK_ARRAY[hours]
+
+        # Weighted combination, summed in the same order as the scalar path
+        risk_scores = np.clip(
+            self.WEIGHT_AMOUNT * amount_scores
+            + self.WEIGHT_TIME * time_scores
+            + self.WEIGHT_VELOCITY * velocity_scores
+            + self.WEIGHT_CATEGORY * category_scores
+            + self.WEIGHT_PATTERN * pattern_scores,
+            0.0,
+            1.0,
+        )
+        is_fraud = risk_scores >= _THRESHOLD
+
+        non_zero_factors = (
+            (amount_scores > 0.1).astype(np.int64)
+            + (time_scores > 0.1)
+            + (velocity_scores > 0.1)
+            + (category_scores > 0.1)
+            + (pattern_scores > 0.1)
+        )
+        confidences = np.where(
+            is_fraud,
+            np.minimum(0.99, 0.6 + (non_zero_factors * 0.08)),
+            np.minimum(0.99, 0.7 + ((5 - non_zero_factors) * 0.06)),
+        )
+        return amount_scores, time_scores, risk_scores, is_fraud, confidences
+
+    def _combine_batch_numba(
+        self,
+        amounts: np.ndarray,
+        hours: np.ndarray,
+        velocity_scores: np.ndarray,
+        category_scores: np.ndarray,
+        pattern_scores: np.ndarray,
+    ) -> Tuple[np.ndarray, ...]:
+        """Same as _combine_batch_numpy, fused into one compiled loop."""
+        n = amounts.shape[0]
+        amount_scores = np.empty(n, dtype=np.float64)
+        time_scores = np.empty(n, dtype=np.float64)
+        risk_scores = np.empty(n, dtype=np.float64)
+        is_fraud = np.empty(n, dtype=np.bool_)
+        confidences = np.empty(n, dtype=np.float64)
+        _numba_kernels.score_batch(
+            amounts, hours, velocity_scores, category_scores, pattern_scores,
+            np.array([
+                self.WEIGHT_AMOUNT, self.WEIGHT_TIME, self.WEIGHT_VELOCITY,
+                self.WEIGHT_CATEGORY, self.WEIGHT_PATTERN,
+            ]),
+            self.MODERATE_AMOUNT_THRESHOLD,
+            self.HIGH_AMOUNT_THRESHOLD,
+            self.VERY_HIGH_AMOUNT_THRESHOLD,
+            _THRESHOLD,
+            amount_scores, time_scores, risk_scores, is_fraud, confidences,
+        )
+        return amount_scores, time_scores, risk_scores, is_fraud, confidences
+
+    def _score_amount(self, amount: float) -> float:
         """Score risk based on transaction amount."""
         if amount >= self.VERY_HIGH_AMOUNT_THRESHOLD:
             return 1.0
         elif amount >= self.HIGH_AMOUNT_THRESHOLD:
             # Linear scale from 0.5 to 1.0 between thresholds
-            range_size = float(
-                self.VERY_HIGH_AMOUNT_THRESHOLD - self.HIGH_AMOUNT_THRESHOLD
-            )
-            position = float(amount - self.HIGH_AMOUNT_THRESHOLD)
+            range_size = self.VERY_HIGH_AMOUNT_THRESHOLD - self.HIGH_AMOUNT_THRESHOLD
+            position = amount - self.HIGH_AMOUNT_THRESHOLD
             return 0.5 + (position / range_size) * 0.5
-        elif amount >= Decimal("1000.00"):
+        elif amount >= self.MODERATE_AMOUNT_THRESHOLD:
             # Moderate risk for amounts $1000-$5000
-            return float(amount - Decimal("1000.00")) / 4000.0 * 0.3
+            return (amount - self.MODERATE_AMOUNT_THRESHOLD) / 4000.0 * 0.3
         return 0.0
 
-    def _score_time(self, dt: datetime) -> float:
-        """Score risk based on time of day (UTC)."""
-        hour = dt.hour
-        # Highest risk: midnight to 5 AM
-        if 0 <= hour < 5:
-            return 0.8
-        # Moderate risk: 5-6 AM and 11 PM-midnight
-        elif hour == 5 or hour == 23:
-            return 0.4
-        return 0.0
-
-    def _score_velocity(self, user_id: str, now: datetime) -> float:
-        """Score risk based on transaction velocity."""
-        cutoff = now - timedelta(seconds=self.VELOCITY_WINDOW_SECONDS)
+    def _score_time(self, hour: int) -> float:
+        """Score risk based on the hour of day (UTC)."""
+        return self._HOUR_RISK[hour]
+
+    def _score_velocity(self, user_id: str, now_ts: float) -> float:
+        """Score risk based on transaction velocity (now_ts in epoch seconds)."""
+        # Epoch floats: cheaper to compare and store than datetimes
+        cutoff = now_ts - self.VELOCITY_WINDOW_SECONDS
+        index = hash(user_id) & (_NUM_SHARDS - 1)
+        lock, tracked, last_seen = self._velocity_shards[index]
+        now = time.monotonic()
+
+        with lock:
+            history = tracked.get(user_id)
+            if history is None:
+                history = deque()
+                tracked[user_id] = history
+                if len(tracked) > self.MAX_TRACKED_USERS // _NUM_SHARDS:
+                    # Evict the shard's least recently active user
+                    del last_seen[tracked.popitem(last=False)[0]]
+            else:
+                tracked.move_to_end(user_id)
+            last_seen[user_id] = now
+            # Prune old entries from the front; the deque is kept sorted, so
+            # this is amortized O(1) and the deque is updated in place
+            while history and history[0] <= cutoff:
+                history.popleft()
+            # Timestamps are client-supplied and batch rows are unordered;
+            # keep the deque sorted so older entries never hide behind the head
+            if not history or now_ts >= history[-1]:
+                history.append(now_ts)
+            else:
+                bisect.insort(history, now_ts)
+            count = len(history)
 
-        history = self._user_transactions.get(user_id, [])
-        # Prune old entries
-        history = [t for t in history if t > cutoff]
-        history.append(now)
-        self._user_transactions[user_id] = history
+            self._shard_calls[index] += 1
+            if self._shard_calls[index] % self.VELOCITY_SWEEP_INTERVAL == 0:
+                self._sweep_idle_users(
+                    tracked, last_seen, now - self.VELOCITY_WINDOW_SECONDS
+                )
 
-        count = len(history)
         if count > self.VELOCITY_MAX_TRANSACTIONS * 2:
             return 1.0
         elif count > self.VELOCITY_MAX_TRANSACTIONS:
@@ -262,34 +695,46 @@ class FraudDetectionService:
             return min(1.0, 0.5 + (excess / self.VELOCITY_MAX_TRANSACTIONS) * 0.5)
         return 0.0
 
+    @staticmethod
+    def _sweep_idle_users(
+        tracked: "OrderedDict[str, deque]", last_seen: Dict[str, float], cutoff: float
+    ) -> None:
+        """
+        Drop users in one shard not seen since ``cutoff`` (time.monotonic(),
+        one velocity window ago). The caller holds the shard's lock.
+
+        Walks from the least recently active end and stops at the first user
+        seen since the cutoff, so the cost is proportional to the number of
+        entries removed.
+        """
+        while tracked:
+            user_id = next(iter(tracked))
+            if last_seen[user_id] > cutoff:
+                break
+            del tracked[user_id]
+            del last_seen[user_id]
+
     def _score_category(self, category: str) -> float:
         """Score risk based on transaction category."""
-        cat_lower = (category or "").lower().strip()
-        if cat_lower in self.HIGH_RISK_CATEGORIES:
-            return 0.9
-        elif cat_lower in self.MEDIUM_RISK_CATEGORIES:
-            return 0.4
-        return 0.0
+        if not category:
+            return 0.0
+        return self._CATEGORY_SCORES.get(category.lower().strip(), 0.0)
 
-    def _score_pattern(self, description: Optional[str], amount: Decimal) -> float:
+    def _score_pattern(self, description: Optional[str], amount: float) -> float:
         """Score risk based on transaction pattern/description heuristics."""
         score = 0.0
 
         if description:
-            desc_lower = description.lower()
-            # Suspicious keywords
-            suspicious_words = [
-                "urgent", "wire", "bitcoin", "crypto", "offshore",
-                "anonymous", "untraceable", "dark", "hack",
-            ]
-            matches = sum(1 for word in suspicious_words if word in desc_lower)
+            # Number of distinct suspicious keywords present
+            matches = len(set(_SUSPICIOUS_RE.findall(description.lower())))
             if matches >= 2:
                 score = 0.8
             elif matches == 1:
                 score = 0.4
 
-        # Round-number amounts are slightly more suspicious (common in fraud)
-        if amount > Decimal("100") and amount == amount.to_integral_value():
+        # Round-number amounts are slightly more suspicious (common in fraud);
+        # is_integer() also copes with inf, which counts as round like Decimal's
+        if amount > 100.0 and (amount.is_integer() or amount == math.inf):
             score = max(score, 0.15)
 
         return min(1.0, score)
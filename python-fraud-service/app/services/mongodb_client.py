@@ -2,10 +2,12 @@
 MongoDB client for persisting fraud analysis results and audit logs.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
+from app.core.clock import utc_now
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -24,14 +26,23 @@ class MongoDBClient:
     Async MongoDB client for fraud detection audit logging.
 
     Collections:
-    - fraud_analyses: Stores every fraud analysis result
-    - fraud_alerts: Stores high-risk transaction alerts
+    - fraud_analyses: Stores every fraud analysis result; fraudulent ones
+      also carry the alert review fields (alert_status, reviewed)
+    - audit_logs: Stores audit entries forwarded by the Java service
+
+    Request handlers queue documents for a background writer, which drains
+    the queue and persists them with one insert_many per collection, so the
+    Mongo round-trip stays off the response path. When the queue is full,
+    the *_async methods write directly in a fire-and-forget task instead.
     """
 
     def __init__(self):
         self._client = None
         self._db = None
         self._connected = False
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._background_writes: Set[asyncio.Task] = set()
 
     async def connect(self) -> bool:
         """Establish connection to MongoDB."""
@@ -61,8 +72,36 @@ class MongoDBClient:
             self._connected = False
             return False
 
+    def start_writer(self) -> bool:
+        """
+        Start the background task that batches queued documents.
+
+        Returns False when MongoDB is not connected or the writer is
+        disabled (MONGODB_WRITE_QUEUE_SIZE=0).
+        """
+        if not self._connected or settings.MONGODB_WRITE_QUEUE_SIZE <= 0:
+            return False
+        if self._writer_task is None:
+            self._write_queue = asyncio.Queue(maxsize=settings.MONGODB_WRITE_QUEUE_SIZE)
+            self._writer_task = asyncio.create_task(self._drain_writes())
+            logger.info("MongoDB background writer started")
+        return True
+
+    async def stop_writer(self):
+        """Flush everything still queued and stop the background writer."""
+        if self._writer_task is None:
+            return
+        await self._write_queue.put(None)  # Sentinel: flush and exit
+        await self._writer_task
+        self._writer_task = None
+        self._write_queue = None
+        logger.info("MongoDB background writer stopped")
+
     async def close(self):
         """Close MongoDB connection."""
+        await self.stop_writer()
+        if self._background_writes:
+            await asyncio.gather(*self._background_writes, return_exceptions=True)
         if self._client:
             self._client.close()
             self._connected = False
@@ -82,40 +121,158 @@ class MongoDBClient:
             return None
 
         try:
-            doc = {
-                **analysis_result,
-                "logged_at": datetime.now(timezone.utc),
-            }
-            result = await self._db.fraud_analyses.insert_one(doc)
+            result = await self._db.fraud_analyses.insert_one(
+                self._analysis_doc(analysis_result)
+            )
+            self._warn_alerts([analysis_result])
             return str(result.inserted_id)
         except Exception as e:
             logger.error("Failed to log fraud analysis: %s", e)
             return None
 
-    async def log_alert(self, analysis_result: Dict[str, Any]) -> Optional[str]:
+    async def log_analyses_bulk(self, analysis_results: List[Dict[str, Any]]) -> None:
         """
-        Log a high-risk fraud alert for review.
+        Persist many analysis results with one insert_many instead of one
+        round-trip per document.
         """
-        if not self._connected or self._db is None:
-            return None
+        if not self._connected or self._db is None or not analysis_results:
+            return
 
         try:
-            doc = {
-                **analysis_result,
-                "alert_status": "pending",
-                "reviewed": False,
-                "created_at": datetime.now(timezone.utc),
-            }
-            result = await self._db.fraud_alerts.insert_one(doc)
-            logger.warning(
-                "Fraud alert created: transaction=%s, risk_score=%s",
-                analysis_result.get("transaction_id"),
-                analysis_result.get("risk_score"),
+            await self._db.fraud_analyses.insert_many(
+                [self._analysis_doc(r) for r in analysis_results], ordered=False
             )
-            return str(result.inserted_id)
+            self._warn_alerts(analysis_results)
         except Exception as e:
-            logger.error("Failed to log fraud alert: %s", e)
-            return None
+            logger.error("Failed to log %d fraud analyses: %s", len(analysis_results), e)
+
+    def log_analysis_async(self, analysis_result: Dict[str, Any]) -> None:
+        """Fire-and-forget log_analysis(); see _spawn_write()."""
+        self._spawn_write(self.log_analysis, analysis_result)
+
+    def log_analyses_bulk_async(self, analysis_results: List[Dict[str, Any]]) -> None:
+        """Fire-and-forget log_analyses_bulk(); see _spawn_write()."""
+        self._spawn_write(self.log_analyses_bulk, analysis_results)
+
+    def _spawn_write(self, write: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """
+        Run a write in a background task so the caller does not wait on it.
+
+        At most MONGODB_MAX_PENDING_WRITES such tasks are in flight; beyond
+        that the write is dropped (logging is best-effort) rather than
+        letting tasks pile up while MongoDB is slow.
+        """
+        if not self._connected or self._db is None:
+            return
+        if len(self._background_writes) >= settings.MONGODB_MAX_PENDING_WRITES:
+            logger.warning("Too many pending MongoDB writes; dropping log")
+            return
+        task = asyncio.create_task(write(*args))
+        # Keep a reference until done so the task is not garbage-collected
+        self._background_writes.add(task)
+        task.add_done_callback(self._background_writes.discard)
+
+    def enqueue(self, collection: str, doc: Dict[str, Any]) -> bool:
+        """
+        Queue a document for the background writer without blocking.
+
+        Returns False if the writer is not running or the queue is full;
+        callers should then fall back to a direct (awaited) write.
+        """
+        if self._write_queue is None:
+            return False
+        try:
+            self._write_queue.put_nowait((collection, doc))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def queue_analysis(self, analysis_result: Dict[str, Any]) -> bool:
+        """Queue a fraud analysis result; see enqueue()."""
+        if not self.enqueue("fraud_analyses", self._analysis_doc(analysis_result)):
+            return False
+        self._warn_alerts([analysis_result])
+        return True
+
+    @staticmethod
+    def _analysis_doc(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the fraud_analyses document. Fraudulent results double as the
+        alert record, with a review status served by the alerts index.
+        """
+        doc = {
+            **analysis_result,
+            "logged_at": utc_now(),
+        }
+        if analysis_result.get("is_fraud"):
+            doc["alert_status"] = "pending"
+            doc["reviewed"] = False
+        return doc
+
+    @staticmethod
+    def _warn_alerts(analysis_results: List[Dict[str, Any]]) -> None:
+        for r in analysis_results:
+            if r.get("is_fraud"):
+                logger.warning(
+                    "Fraud alert created: transaction=%s, risk_score=%s",
+                    r.get("transaction_id"),
+                    r.get("risk_score"),
+                )
+
+    async def _drain_writes(self):
+        """
+        Background loop: wait for a document, keep collecting for up to
+        MONGODB_WRITE_FLUSH_MS (or MONGODB_WRITE_BATCH_SIZE documents),
+        then write the batch.
+
+        A full batch is written as soon as it has been collected rather
+        than at the end of the flush interval.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._write_queue
+        batch_size = settings.MONGODB_WRITE_BATCH_SIZE
+        flush_interval = settings.MONGODB_WRITE_FLUSH_MS / 1000.0
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            batch: List[Tuple[str, Dict[str, Any]]] = [item]
+            deadline = loop.time() + flush_interval
+            stopping = False
+
+            while len(batch) < batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    # Wake on the next document instead of sleeping out the interval
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._write_batch(batch)
+            if stopping:
+                return
+
+    async def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Persist queued documents with one insert_many per collection."""
+        by_collection: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for collection, doc in batch:
+            by_collection[collection].append(doc)
+
+        for collection, docs in by_collection.items():
+            try:
+                await self._db[collection].insert_many(docs, ordered=False)
+            except Exception as e:
+                logger.error("Failed to write %d documents to %s: %s", len(docs), collection, e)
 
     async def _ensure_indexes(self):
         """Create indexes for efficient querying."""
@@ -123,16 +280,62 @@ class MongoDBClient:
             return
         try:
             await self._db.fraud_analyses.create_index("transaction_id")
-            await self._db.fraud_analyses.create_index("logged_at")
+            await self._ensure_logged_at_index()
+            # Serves "highest risk, newest first" queries; the risk_score
+            # prefix also covers what the old single-field index did
+            await self._db.fraud_analyses.create_index(
+                [("risk_score", -1), ("logged_at", -1)], name="risk_logged_desc"
+            )
+            await self._drop_index_if_exists("fraud_analyses", "risk_score_-1")
+            # Serves "pending alerts, newest first"; partial, so it only
+            # holds the fraudulent analyses
             await self._db.fraud_analyses.create_index(
-                [("risk_score", -1)],
+                [("alert_status", 1), ("logged_at", -1)],
+                partialFilterExpression={"is_fraud": True},
+                name="alerts_partial",
             )
-            await self._db.fraud_alerts.create_index("alert_status")
-            await self._db.fraud_alerts.create_index("created_at")
             logger.info("MongoDB indexes ensured")
         except Exception as e:
             logger.warning("Failed to create MongoDB indexes: %s", e)
 
+    async def _drop_index_if_exists(self, collection: str, name: str):
+        """Drop an index superseded by one that has just been created."""
+        try:
+            await self._db[collection].drop_index(name)
+        except Exception:
+            pass  # Already gone (or never created)
+
+    async def _ensure_logged_at_index(self):
+        """
+        Index fraud_analyses.logged_at, as a TTL index when
+        MONGODB_ANALYSIS_TTL_DAYS is set.
+
+        An existing plain index on logged_at is converted in place with
+        collMod, since create_index cannot change an index's options. If that
+        fails too (collMod needs MongoDB 5.1+ for this), the plain index is
+        kept and the failure is only logged, so the remaining indexes are
+        still created.
+        """
+        ttl_days = settings.MONGODB_ANALYSIS_TTL_DAYS
+        if ttl_days <= 0:
+            await self._db.fraud_analyses.create_index("logged_at")
+            return
+
+        ttl_seconds = ttl_days * 86400
+        try:
+            await self._db.fraud_analyses.create_index(
+                "logged_at", expireAfterSeconds=ttl_seconds
+            )
+        except Exception:
+            try:
+                await self._db.command(
+                    "collMod",
+                    "fraud_analyses",
+                    index={"keyPattern": {"logged_at": 1}, "expireAfterSeconds": ttl_seconds},
+                )
+            except Exception as e:
+                logger.warning("Failed to set a TTL on fraud_analyses.logged_at: %s", e)
+
 
 # Singleton instance
 mongodb_client = MongoDBClient()
@@ -57,6 +57,19 @@ def test_detect_accepts_valid_payload(client):
     assert 0 <= float(body["risk_score"]) <= 1
 
 
+def test_detect_scores_infinite_amount(client):
+    # JSON 1e400 parses to inf, which the legacy schema accepts
+    r = client.post(
+        "/detect",
+        content='{"user_id": 7, "amount": 1e400, "timestamp": "2025-01-01T12:00:00Z"}',
+        headers={"Content-Type": "application/json"},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["reason"].startswith("High transaction amount")
+    assert body["risk_score"] == 0.3225
+
+
 def test_audit_accepts_payload(client):
     r = client.post("/api/audit", json={"event": "test", "detail": "brutal"})
     assert r.status_code == 200
@@ -78,6 +91,48 @@ def test_analyze_requires_valid_uuid(client):
     assert r.status_code == 422
 
 
+@pytest.mark.parametrize("amount", ["inf", "Infinity", "NaN", 1e400])
+def test_analyze_rejects_non_finite_amount(client, amount):
+    r = client.post(
+        "/api/fraud/analyze",
+        json={
+            "transaction_id": str(uuid.uuid4()),
+            "user_id": str(uuid.uuid4()),
+            "amount": amount,
+            "transaction_type": "EXPENSE",
+            "category": "other",
+            "transaction_date": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+    assert r.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "spelling",
+    [
+        lambda u: u.hex,
+        lambda u: "{%s}" % u,
+        lambda u: u.urn,
+        lambda u: str(u).upper(),
+    ],
+)
+def test_analyze_normalizes_uuid_spellings(client, spelling):
+    tid = uuid.uuid4()
+    r = client.post(
+        "/api/fraud/analyze",
+        json={
+            "transaction_id": spelling(tid),
+            "user_id": str(uuid.uuid4()),
+            "amount": "10.00",
+            "transaction_type": "EXPENSE",
+            "category": "other",
+            "transaction_date": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["transaction_id"] == str(tid)
+
+
 def test_analyze_happy_path(client):
     tid = str(uuid.uuid4())
     uid = str(uuid.uuid4())
@@ -117,3 +172,112 @@ def test_batch_analyze_empty_list(client):
     r = client.post("/api/fraud/batch", json=[])
     assert r.status_code == 200
     assert r.json() == []
+
+
+def test_batch_analyze_scores_every_item(client):
+    ids = [str(uuid.uuid4()) for _ in range(5)]
+    r = client.post(
+        "/api/fraud/batch",
+        json=[
+            {
+                "transaction_id": tid,
+                "user_id": str(uuid.uuid4()),
+                "amount": str(50 * (i + 1)),
+                "transaction_type": "EXPENSE",
+                "category": "groceries",
+                "transaction_date": datetime.now(timezone.utc).isoformat(),
+            }
+            for i, tid in enumerate(ids)
+        ],
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert [item["transaction_id"] for item in body] == ids
+    assert all(0 <= item["risk_score"] <= 1 for item in body)
+
+
+def _risky_payload(user_id):
+    """Gambling at 03:15 with two suspicious keywords: rule score 0.375."""
+    return {
+        "transaction_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        # Not a multiple of $10, so an amount-bucketed ML score would differ
+        "amount": "44.00",
+        "transaction_type": "EXPENSE",
+        "category": "gambling",
+        "transaction_date": "2025-03-04T03:15:00Z",
+        "description": "bitcoin wire",
+    }
+
+
+def _seventh_in_a_minute(client, endpoint):
+    """
+    Score a risky transaction after six earlier ones from the same user,
+    whose velocity factor of 1.0 lifts the rule score to 0.625: inside the
+    band where the ML score can change the verdict.
+    """
+    user_id = str(uuid.uuid4())
+    assert client.post("/api/fraud/batch", json=[_risky_payload(user_id)] * 6).status_code == 200
+    if endpoint == "analyze":
+        r = client.post("/api/fraud/analyze", json=_risky_payload(user_id))
+        assert r.status_code == 200
+        return r.json()
+    r = client.post("/api/fraud/batch", json=[_risky_payload(user_id)])
+    assert r.status_code == 200
+    return r.json()[0]
+
+
+def test_analyze_blends_ml_score_inside_undecided_band(client):
+    from app.ml.model_manager import model_manager
+
+    ml_score = model_manager.predict(model_manager.extract_features(44.0, 3, 1))
+    body = _seventh_in_a_minute(client, "analyze")
+    assert body["risk_score"] == round(0.625 * 0.7 + ml_score * 0.3, 4)
+
+
+def test_analyze_reports_rule_score_outside_undecided_band(client):
+    r = client.post("/api/fraud/analyze", json=_risky_payload(str(uuid.uuid4())))
+    assert r.status_code == 200
+    # 0.375 cannot reach the threshold even with ml=1, so the model is skipped
+    assert r.json()["risk_score"] == 0.375
+    assert r.json()["is_fraud"] is False
+
+
+def test_analyze_and_batch_agree_on_ml_blend(client):
+    single = _seventh_in_a_minute(client, "analyze")
+    batch = _seventh_in_a_minute(client, "batch")
+    assert single["risk_score"] != 0.625
+    assert single["risk_score"] == batch["risk_score"]
+    assert single["is_fraud"] == batch["is_fraud"]
+
+
+def test_analyze_and_batch_round_halfway_blend_alike(client, monkeypatch):
+    from app.api.v1.fraud import fraud_service
+    from app.ml.model_manager import model_manager
+
+    # 0.5717 * 0.7 + 0.9992 * 0.3 sits on the 0.69995 tie: round() gives
+    # 0.6999 (under the 0.7 threshold), np.round gives 0.7
+    analyze_transaction = fraud_service.analyze_transaction
+    analyze_batch = fraud_service.analyze_batch
+
+    def pinned_single(**kwargs):
+        result = analyze_transaction(**kwargs)
+        result.risk_score = 0.5717
+        return result
+
+    def pinned_batch(transactions):
+        results = analyze_batch(transactions)
+        for result in results:
+            result.risk_score = 0.5717
+        return results
+
+    monkeypatch.setattr(fraud_service, "analyze_transaction", pinned_single)
+    monkeypatch.setattr(fraud_service, "analyze_batch", pinned_batch)
+    monkeypatch.setattr(model_manager, "predict_cached", lambda **kwargs: 0.9992)
+    monkeypatch.setattr(model_manager, "predict_many", lambda features: [0.9992] * len(features))
+
+    payload = _risky_payload(str(uuid.uuid4()))
+    single = client.post("/api/fraud/analyze", json=payload).json()
+    batch = client.post("/api/fraud/batch", json=[payload]).json()[0]
+    assert single["risk_score"] == batch["risk_score"] == 0.6999
+    assert single["is_fraud"] is batch["is_fraud"] is False
@@ -0,0 +1,134 @@
+"""Rule-based scorer: batch results must match per-transaction analysis."""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+from app.services import fraud_detector  # noqa: E402
+from app.services.fraud_detector import FraudDetectionService  # noqa: E402
+
+
+def _transactions(user_id):
+    base = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+    rows = [
+        (45.5, "groceries", base, None),
+        (200.0, "groceries", base, None),
+        (3200.0, "gift card", base.replace(hour=23), "urgent"),
+        (6000.0, "Gambling ", base.replace(hour=3), "bitcoin wire offshore"),
+        (30000.0, "wire transfer", base.replace(hour=5), None),
+        (500.0, "", datetime(2025, 3, 1, 2, 30), "dinner"),
+    ]
+    return [
+        {
+            "transaction_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "amount": amount,
+            "category": category,
+            "transaction_date": dt,
+            "description": description,
+        }
+        for amount, category, dt, description in rows
+    ]
+
+
+def test_analyze_batch_matches_single_analysis():
+    service = FraudDetectionService()
+    # Velocity state is per user, so each path gets its own user
+    single_txns = _transactions(str(uuid.uuid4()))
+    batch_txns = _transactions(str(uuid.uuid4()))
+
+    single = [service.analyze_transaction(**txn).to_dict() for txn in single_txns]
+    batch = [r.to_dict() for r in service.analyze_batch(batch_txns)]
+
+    assert len(batch) == len(single)
+    for s, b, txn in zip(single, batch, batch_txns):
+        assert b["transaction_id"] == txn["transaction_id"]
+        s.pop("transaction_id")
+        b.pop("transaction_id")
+        assert b == s
+
+
+def test_analyze_batch_empty():
+    assert FraudDetectionService().analyze_batch([]) == []
+
+
+def test_analyze_batch_isolates_invalid_rows():
+    service = FraudDetectionService()
+    txns = _transactions(str(uuid.uuid4()))
+    txns[1]["amount"] = float("inf")
+    txns[3]["category"] = 42
+    reference = _transactions(str(uuid.uuid4()))
+    del reference[3], reference[1]
+
+    batch = service.analyze_batch(txns)
+    expected = [r.to_dict() for r in service.analyze_batch(reference)]
+
+    assert [r.transaction_id for r in batch] == [t["transaction_id"] for t in txns]
+    for i in (1, 3):
+        assert batch[i].detected_anomalies == ["Analysis error occurred"]
+    valid = [batch[i].to_dict() for i in (0, 2, 4, 5)]
+    for got, want in zip(valid, expected):
+        got.pop("transaction_id")
+        want.pop("transaction_id")
+        assert got == want
+
+
+def test_velocity_prunes_out_of_order_history():
+    service = FraudDetectionService()
+    user_id = str(uuid.uuid4())
+    # An hour-old burst arrives after a newer transaction; it must not linger
+    # behind the newer head and count toward the window an hour later
+    for hour, minute, second in ((12, 0, 0), (11, 0, 0), (11, 0, 10), (11, 0, 20)):
+        service.analyze_transaction(
+            transaction_id=str(uuid.uuid4()),
+            user_id=user_id,
+            amount=45.5,
+            category="groceries",
+            transaction_date=datetime(2025, 3, 1, hour, minute, second, tzinfo=timezone.utc),
+        )
+
+    result = service.analyze_transaction(
+        transaction_id=str(uuid.uuid4()),
+        user_id=user_id,
+        amount=45.5,
+        category="groceries",
+        transaction_date=datetime(2025, 3, 1, 12, 0, 30, tzinfo=timezone.utc),
+    )
+    assert result.velocity_score == 0.0
+    assert "Rapid transaction activity detected" not in result.detected_anomalies
+
+
+def test_idle_sweep_ignores_client_supplied_dates(monkeypatch):
+    service = FraudDetectionService()
+    monkeypatch.setattr(service, "VELOCITY_SWEEP_INTERVAL", 1)  # sweep on every call
+    victim = str(uuid.uuid4())
+    shard = hash(victim) & (fraud_detector._NUM_SHARDS - 1)
+    attacker = next(
+        uid for uid in (str(uuid.uuid4()) for _ in range(10_000))
+        if hash(uid) & (fraud_detector._NUM_SHARDS - 1) == shard
+    )
+
+    def send(user_id, when):
+        return service.analyze_transaction(
+            transaction_id=str(uuid.uuid4()),
+            user_id=user_id,
+            amount=45.5,
+            category="groceries",
+            transaction_date=when,
+        )
+
+    base = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+    for second in range(3):
+        send(victim, base.replace(second=second))
+    # A far-future date must not make the rest of the shard look idle
+    send(attacker, datetime(2099, 1, 1, tzinfo=timezone.utc))
+    assert send(victim, base.replace(second=3)).velocity_score > 0.0
+
+    # Users unseen for a velocity window of wall-clock time are still evicted
+    later = fraud_detector.time.monotonic() + service.VELOCITY_WINDOW_SECONDS + 1
+    monkeypatch.setattr(fraud_detector.time, "monotonic", lambda: later)
+    send(attacker, datetime(2099, 1, 1, 0, 0, 1, tzinfo=timezone.utc))
+    assert victim not in service._velocity_shards[shard][1]
@@ -0,0 +1,53 @@
+"""Isolation Forest scoring: the fast paths must match sklearn's public API."""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+from app.core.config import settings  # noqa: E402
+from app.ml.model_manager import ModelManager  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ML_MODEL_PATH", str(tmp_path / "model.pkl"))
+    m = ModelManager()
+    assert asyncio.run(m.load_model())
+    return m
+
+
+def _features(m):
+    rng = np.random.RandomState(7)
+    return [
+        m.extract_features(float(amount), int(hour), int(day))
+        for amount, hour, day in zip(
+            rng.lognormal(4.0, 2.0, 200), rng.randint(0, 24, 200), rng.randint(0, 7, 200)
+        )
+    ]
+
+
+def _expected(m, features):
+    decision = m._model.decision_function(np.stack(features))
+    return np.round(np.clip(0.5 - decision, 0.0, 1.0), 4).tolist()
+
+
+def test_predict_matches_decision_function(manager):
+    features = _features(manager)
+    assert [manager.predict(f) for f in features] == _expected(manager, features)
+
+
+def test_predict_many_matches_decision_function(manager):
+    features = _features(manager)
+    assert manager.predict_many(features) == _expected(manager, features)
+
+
+def test_predict_cached_matches_predict(manager):
+    for amount, hour, day in [(44.0, 3, 1), (44.0, 3, 1), (1234.56, 14, 5)]:
+        assert manager.predict_cached(amount, hour, day) == manager.predict(
+            manager.extract_features(amount, hour, day)
+        )
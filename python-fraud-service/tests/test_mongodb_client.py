@@ -0,0 +1,194 @@
+"""MongoDB client against an in-memory fake database (no server needed)."""
+
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+from app.core.config import settings  # noqa: E402
+from app.services.mongodb_client import MongoDBClient  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    async def create_index(self, keys, **kwargs):
+        name = kwargs.get("name", keys if isinstance(keys, str) else repr(keys))
+        if name in self.db.failing_indexes:
+            raise RuntimeError(f"cannot create {name}")
+        self.db.calls.append(("create_index", self.name, name, kwargs))
+
+    async def drop_index(self, name):
+        self.db.calls.append(("drop_index", self.name, name))
+
+    async def insert_many(self, docs, ordered=True):
+        await self.db.release.wait()
+        self.db.calls.append(("insert_many", self.name, len(docs)))
+
+    async def insert_one(self, doc):
+        await self.db.release.wait()
+        self.db.calls.append(("insert_one", self.name, 1))
+        return type("InsertOneResult", (), {"inserted_id": len(self.db.calls)})()
+
+
+class FakeDB:
+    def __init__(self, failing_indexes=(), failing_commands=()):
+        self.calls = []
+        self.failing_indexes = set(failing_indexes)
+        self.failing_commands = set(failing_commands)
+        # Writes block until this is set, to simulate a slow server
+        self.release = asyncio.Event()
+        self.release.set()
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+    def __getattr__(self, name):
+        return FakeCollection(self, name)
+
+    async def command(self, name, *args, **kwargs):
+        if name in self.failing_commands:
+            raise RuntimeError(f"{name} not supported")
+        self.calls.append(("command", name, args, kwargs))
+
+
+def _client(db):
+    client = MongoDBClient()
+    client._db = db
+    client._connected = True
+    return client
+
+
+@pytest.mark.asyncio
+async def test_old_risk_index_dropped_after_compound_index_created():
+    db = FakeDB()
+    await _client(db)._ensure_indexes()
+
+    names = [c[2] for c in db.calls if c[0] in ("create_index", "drop_index")]
+    assert "alerts_partial" in names
+    assert names.index("risk_logged_desc") < names.index("risk_score_-1")
+
+
+@pytest.mark.asyncio
+async def test_old_risk_index_kept_when_compound_index_fails():
+    db = FakeDB(failing_indexes={"risk_logged_desc"})
+    await _client(db)._ensure_indexes()
+
+    assert not [c for c in db.calls if c[0] == "drop_index"]
+
+
+@pytest.mark.asyncio
+async def test_ttl_conversion_failure_does_not_skip_other_indexes(monkeypatch):
+    monkeypatch.setattr(settings, "MONGODB_ANALYSIS_TTL_DAYS", 30)
+    db = FakeDB(failing_indexes={"logged_at"}, failing_commands={"collMod"})
+    await _client(db)._ensure_indexes()
+
+    created = [c[2] for c in db.calls if c[0] == "create_index"]
+    assert "risk_logged_desc" in created
+    assert "alerts_partial" in created
+    assert ("drop_index", "fraud_analyses", "risk_score_-1") in db.calls
+
+
+def _writes(db):
+    return [c for c in db.calls if c[0] in ("insert_many", "insert_one")]
+
+
+@pytest.fixture
+def writer_settings(monkeypatch):
+    def configure(queue_size=100, batch_size=100, flush_ms=10_000, max_pending=256):
+        monkeypatch.setattr(settings, "MONGODB_WRITE_QUEUE_SIZE", queue_size)
+        monkeypatch.setattr(settings, "MONGODB_WRITE_BATCH_SIZE", batch_size)
+        monkeypatch.setattr(settings, "MONGODB_WRITE_FLUSH_MS", flush_ms)
+        monkeypatch.setattr(settings, "MONGODB_MAX_PENDING_WRITES", max_pending)
+    return configure
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_full_batch_without_waiting(writer_settings):
+    writer_settings(batch_size=5)
+    db = FakeDB()
+    client = _client(db)
+    assert client.start_writer()
+    for i in range(5):
+        assert client.queue_analysis({"transaction_id": str(i), "is_fraud": False})
+
+    await asyncio.sleep(0.05)  # Far below the 10 s flush interval
+    assert _writes(db) == [("insert_many", "fraud_analyses", 5)]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_partial_batch_on_timeout(writer_settings):
+    writer_settings(flush_ms=20)
+    db = FakeDB()
+    client = _client(db)
+    client.start_writer()
+    client.queue_analysis({"transaction_id": "1", "is_fraud": False})
+    client.queue_analysis({"transaction_id": "2", "is_fraud": False})
+
+    await asyncio.sleep(0.2)
+    assert _writes(db) == [("insert_many", "fraud_analyses", 2)]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_queued_documents(writer_settings):
+    writer_settings()
+    db = FakeDB()
+    client = _client(db)
+    client.start_writer()
+    for i in range(3):
+        client.queue_analysis({"transaction_id": str(i), "is_fraud": False})
+    client.enqueue("audit_logs", {"event": "test"})
+
+    await client.close()
+    assert sorted(_writes(db)) == [
+        ("insert_many", "audit_logs", 1),
+        ("insert_many", "fraud_analyses", 3),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_falls_back_to_async_write(writer_settings):
+    writer_settings(queue_size=2)
+    db = FakeDB()
+    client = _client(db)
+    client.start_writer()
+
+    # No await in between, so the writer cannot drain the queue
+    queued = []
+    for i in range(3):
+        doc = {"transaction_id": str(i), "is_fraud": False}
+        queued.append(client.queue_analysis(doc))
+        if not queued[-1]:
+            client.log_analysis_async(doc)
+    assert queued == [True, True, False]
+    assert len(client._background_writes) == 1
+
+    await client.close()
+    assert sorted(_writes(db)) == [
+        ("insert_many", "fraud_analyses", 2),
+        ("insert_one", "fraud_analyses", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_writes_dropped_past_pending_cap(writer_settings):
+    writer_settings(max_pending=2)
+    db = FakeDB()
+    db.release.clear()  # MongoDB is slow: writes stay in flight
+    client = _client(db)
+
+    for i in range(4):
+        client.log_analysis_async({"transaction_id": str(i), "is_fraud": False})
+    assert len(client._background_writes) == 2
+
+    db.release.set()
+    await client.close()
+    assert len(_writes(db)) == 2
+    assert not client._background_writes